@@ -1,10 +1,20 @@
 import os
 import sys
 import time
+import atexit
 import signal
+import queue
 import logging
+import logging.handlers
 import asyncio
-from web3 import Web3
+import operator
+from collections import OrderedDict
+from dataclasses import dataclass
+import aiohttp
+import orjson
+from web3 import AsyncWeb3, AsyncHTTPProvider
+from web3.datastructures import AttributeDict
+from web3.providers.websocket import WebsocketProviderV2
 from dotenv import load_dotenv
 from database import store_transactions_batch, test_connection
 from datetime import datetime
@@ -16,6 +26,13 @@ load_dotenv()
 log_filename = f'contract_scanner_{datetime.now().strftime("%Y%m%d_%H%M%S")}.log'
 report_filename = f'experiment_report_{datetime.now().strftime("%Y%m%d_%H%M%S")}.txt'
 
+# Skip logging's per-record frame introspection and thread/process lookups -
+# none of these fields appear in our format string
+logging.logThreads = False
+logging.logProcesses = False
+logging.logMultiprocessing = False
+logging._srcfile = None
+
 # Clear any existing handlers
 logging.getLogger().handlers = []
 
@@ -33,15 +50,17 @@ console_handler = logging.StreamHandler(sys.stdout)
 console_handler.setLevel(logging.INFO)
 console_handler.setFormatter(console_formatter)
 
-# Configure root logger
+# Route records through a queue so log calls never block the event loop on
+# disk or terminal writes; a listener thread drains to the real handlers
+log_queue = queue.SimpleQueue()
 logger = logging.getLogger()
 logger.setLevel(logging.INFO)
-logger.addHandler(file_handler)
-logger.addHandler(console_handler)
-
-# Force immediate flush of logs
-for handler in logger.handlers:
-    handler.flush()
+logger.addHandler(logging.handlers.QueueHandler(log_queue))
+log_listener = logging.handlers.QueueListener(
+    log_queue, file_handler, console_handler, respect_handler_level=True
+)
+log_listener.start()
+atexit.register(log_listener.stop)
 
 # Initialize Web3 with RPC URL from environment variables
 rpc_url = os.getenv("BASE_MAINNET_RPC_URL")
@@ -49,187 +68,523 @@ if not rpc_url:
     logger.error("BASE_MAINNET_RPC_URL not found in environment variables")
     exit(1)
 
+class FastAsyncHTTPProvider(AsyncHTTPProvider):
+    """AsyncHTTPProvider that decodes RPC responses with orjson
+
+    Full-transaction block responses run to hundreds of KB; orjson's C
+    parser cuts their decode cost substantially versus the stdlib json
+    module. Request encoding stays on the default serializer, which knows
+    web3's types and only handles tiny payloads anyway.
+    """
+    def decode_rpc_response(self, raw_response):
+        return orjson.loads(raw_response)
+
 logger.info(f"Using RPC URL: {rpc_url}")
-w3 = Web3(Web3.HTTPProvider(rpc_url))
+w3 = AsyncWeb3(FastAsyncHTTPProvider(rpc_url))
+
+# Optional WebSocket endpoint for newHeads subscriptions (polling fallback if unset)
+wss_url = os.getenv("BASE_MAINNET_WSS_URL")
 
 # Configuration
 BATCH_SIZE = 25  # Optimal batch size based on testing
 RPC_LIMIT = 50  # Maximum requests per second allowed
-RATE_LIMIT_DELAY = 1/RPC_LIMIT  # seconds between requests (0.02s for 50 RPS)
 MAX_RETRIES = 3
 INITIAL_BACKOFF = 1  # seconds
+RETRYABLE_STATUS_CODES = {429, 502, 503, 504}  # HTTP statuses worth retrying
 MAX_CONCURRENT_BATCHES = 8  # Number of transaction batches to process in parallel
 PREFETCH_BLOCKS = 5  # Number of blocks to prefetch
+BLOCK_CONCURRENCY = PREFETCH_BLOCKS * 2  # Blocks processed concurrently per slice
 RPC_BATCH_SIZE = 10  # Number of RPC requests to process in parallel
 
-# RPC request tracking
-last_request_time = 0
-request_times = []  # Rolling window of request timestamps
-REQUEST_WINDOW = 1.0  # 1 second window for rate limiting
+# Common contract creation bytecode prefixes (Solidity constructor variants)
+CREATION_PREFIXES = ('0x60806040', '0x60606040')
+
+# Byte-level equivalents for raw HexBytes input (avoids hex-encoding the calldata)
+CREATION_PREFIXES_BYTES = tuple(bytes.fromhex(p[2:]) for p in CREATION_PREFIXES)
+
+class TokenBucket:
+    """Token-bucket rate limiter (capacity = burst, refilled at rate tokens/sec)"""
+    def __init__(self, rate, burst):
+        self.rate = rate
+        self.burst = burst
+        self.tokens = float(burst)
+        self.last_refill = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    async def acquire(self):
+        """Take one token, sleeping only when the bucket is empty"""
+        # The lock keeps refill-check-take atomic across concurrent acquirers
+        # (the sleep below yields, so without it two waiters could both spend
+        # the same token) and makes waiters proceed in FIFO order
+        async with self._lock:
+            while True:
+                now = time.monotonic()
+                self.tokens = min(self.burst, self.tokens + (now - self.last_refill) * self.rate)
+                self.last_refill = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                await asyncio.sleep((1 - self.tokens) / self.rate)
+
+# RPC rate limiter sized to the provider's request-per-second budget
+rate_limiter = TokenBucket(RPC_LIMIT, RPC_LIMIT)
+
+# Shared aiohttp session for raw JSON-RPC calls (created lazily, reuses TCP/TLS)
+rpc_session = None
 
-# Block data cache
-block_cache = {}
+# Whether the provider accepts JSON-RPC batch requests (disabled on first rejection)
+batch_rpc_supported = True
+
+# Whether the provider supports eth_getBlockReceipts (disabled on first rejection)
+block_receipts_supported = True
+
+# Block data cache - OrderedDict gives O(1) true-LRU eviction
+block_cache = OrderedDict()
 CACHE_SIZE = 20  # Maximum number of blocks to cache
 
-# Global variables for experiment tracking
-experiment_start_time = None
-experiment_start_block = None
-experiment_end_block = None
-experiment_contract_count = 0
-experiment_total_blocks = 0
-experiment_total_txs = 0
-experiment_rpc_requests = 0
-experiment_rpc_errors = 0
+# In-flight block fetches keyed like block_cache, so concurrent misses for
+# the same block share one RPC instead of each issuing their own
+inflight_blocks = {}
+
+# Block receipts cache keyed by block number (retries/reorg re-reads hit memory, not RPC)
+receipts_cache = OrderedDict()
+
+@dataclass
+class ExperimentStats:
+    """Counters for the current experiment run (single event loop, so plain
+    attribute increments are safe without a lock)"""
+    start_time: float = None
+    start_block: int = None
+    end_block: int = None
+    contract_count: int = 0
+    total_txs: int = 0
+    rpc_requests: int = 0
+    rpc_errors: int = 0
+
+# Experiment tracking
+stats = ExperimentStats()
 
 # Add global shutdown flag
 shutdown_event = asyncio.Event()
 
+# Cross-block insert buffer: blocks append rows here and a background task
+# flushes them in bulk, amortizing the database round-trip
+FLUSH_SIZE = 50  # Flush as soon as this many rows are pending
+FLUSH_INTERVAL = 10  # Seconds between time-based flushes
+pending_contracts = []
+pending_lock = asyncio.Lock()
+
 def signal_handler(signum, frame):
     """Handle shutdown signals gracefully"""
     logger.info(f"\nReceived signal {signum}. Cleaning up...")
-    
-    # Get current chain block number at shutdown
-    current_chain_block = w3.eth.block_number
-    
+
     # Calculate experiment metrics
-    if experiment_start_time:
-        duration = time.time() - experiment_start_time
-        blocks_processed = experiment_end_block - experiment_start_block if experiment_end_block else 0
-        
+    # (the async provider cannot be queried from a sync signal handler,
+    # so the chain-gap figures are only in the regular shutdown report)
+    if stats.start_time:
+        duration = time.time() - stats.start_time
+        blocks_processed = stats.end_block - stats.start_block if stats.end_block else 0
+
         logger.info("\n=== Experiment Results ===")
         logger.info(f"Duration: {duration:.2f} seconds")
-        logger.info(f"Start Block: {experiment_start_block}")
-        logger.info(f"Last Processed Block: {experiment_end_block}")
-        logger.info(f"Current Chain Block: {current_chain_block}")
-        logger.info(f"Block Gap: {current_chain_block - experiment_end_block} blocks")
-        logger.info(f"Gap Percentage: {(current_chain_block - experiment_end_block)/current_chain_block*100:.2f}%")
+        logger.info(f"Start Block: {stats.start_block}")
+        logger.info(f"Last Processed Block: {stats.end_block}")
         logger.info(f"Blocks Processed: {blocks_processed}")
         logger.info(f"Blocks per Second: {blocks_processed/duration:.2f}")
-        logger.info(f"Contract Creations Found: {experiment_contract_count}")
-        logger.info(f"Contracts per Second: {experiment_contract_count/duration:.2f}")
-        logger.info(f"Total Transactions Processed: {experiment_total_txs}")
-        logger.info(f"Average Transactions per Block: {experiment_total_txs/blocks_processed:.2f}")
-        logger.info(f"RPC Requests Made: {experiment_rpc_requests}")
-        logger.info(f"RPC Errors: {experiment_rpc_errors}")
-        if experiment_rpc_requests > 0:
-            logger.info(f"RPC Success Rate: {(experiment_rpc_requests - experiment_rpc_errors)/experiment_rpc_requests*100:.2f}%")
+        logger.info(f"Contract Creations Found: {stats.contract_count}")
+        logger.info(f"Contracts per Second: {stats.contract_count/duration:.2f}")
+        logger.info(f"Total Transactions Processed: {stats.total_txs}")
+        logger.info(f"Average Transactions per Block: {stats.total_txs/blocks_processed:.2f}")
+        logger.info(f"RPC Requests Made: {stats.rpc_requests}")
+        logger.info(f"RPC Errors: {stats.rpc_errors}")
+        if stats.rpc_requests > 0:
+            logger.info(f"RPC Success Rate: {(stats.rpc_requests - stats.rpc_errors)/stats.rpc_requests*100:.2f}%")
         else:
             logger.info("RPC Success Rate: N/A (no requests made)")
     
-    # Force flush all handlers
-    for handler in logger.handlers:
-        handler.flush()
-    
+    # os._exit skips atexit, so persist buffered work here: store any
+    # pending contract creations (the database client is synchronous, so
+    # calling it directly is fine outside the event loop) and flush the
+    # buffered report file
+    if pending_contracts:
+        logger.info(f"Flushing {len(pending_contracts)} pending contract creations...")
+        store_transactions_batch(pending_contracts)
+        pending_contracts.clear()
+    _close_report_file()
+
     # Force exit after a small delay to ensure logs are written
     logger.info("Forcing exit in 2 seconds...")
     time.sleep(2)
-    
-    # Close handlers before exit
-    for handler in logger.handlers:
-        handler.close()
-    
+
+    # Drain queued records and close the real handlers before exit
+    # (os._exit skips atexit, so stop the listener here)
+    log_listener.stop()
+    file_handler.close()
+    console_handler.close()
+
     os._exit(0)
 
 def track_rpc_request(success=True):
     """Track RPC request metrics"""
-    global experiment_rpc_requests, experiment_rpc_errors
-    experiment_rpc_requests += 1
+    stats.rpc_requests += 1
     if not success:
-        experiment_rpc_errors += 1
+        stats.rpc_errors += 1
 
 async def track_request():
     """
-    Track RPC request timing and ensure we don't exceed rate limits
+    Ensure we don't exceed the provider's rate limit before sending an RPC
     """
-    global request_times
-    current_time = time.time()
-    
-    # Remove old requests from the window
-    request_times = [t for t in request_times if current_time - t < REQUEST_WINDOW]
-    
-    # If we're at the limit, wait until we have capacity
-    while len(request_times) >= RPC_LIMIT:
-        oldest_request = min(request_times)
-        wait_time = REQUEST_WINDOW - (current_time - oldest_request)
-        if wait_time > 0:
-            await asyncio.sleep(wait_time)
-        current_time = time.time()
-        request_times = [t for t in request_times if current_time - t < REQUEST_WINDOW]
-    
-    # Add current request
-    request_times.append(current_time)
-    return current_time
+    await rate_limiter.acquire()
+
+def _to_hex_str(value):
+    """Normalize a hash/bytes value to a 0x-prefixed hex string"""
+    if isinstance(value, (bytes, bytearray)):
+        value = value.hex()
+    else:
+        value = str(value)
+    if not value.startswith('0x'):
+        value = '0x' + value
+    return value
+
+def _init_code_hash(input_data):
+    """Keccak of a transaction's init code, for bytes or raw hex-string input"""
+    if isinstance(input_data, (bytes, bytearray)):
+        return AsyncWeb3.keccak(input_data).hex()
+    return AsyncWeb3.keccak(hexstr=input_data).hex()
+
+def _format_raw_transaction(raw):
+    """Convert a raw JSON-RPC transaction dict to the shape web3.py returns"""
+    if raw is None:
+        return None
+    return AttributeDict({
+        'hash': raw.get('hash'),
+        'from': raw.get('from'),
+        'to': raw.get('to'),
+        'input': raw.get('input'),
+    })
+
+def _format_raw_receipt(raw):
+    """Convert a raw JSON-RPC receipt dict to the shape web3.py returns"""
+    if raw is None:
+        return None
+    return AttributeDict({
+        'transactionHash': raw.get('transactionHash'),
+        'contractAddress': raw.get('contractAddress'),
+        'gasUsed': int(raw['gasUsed'], 16),
+        'status': int(raw['status'], 16),
+        'logs': raw.get('logs', []),
+    })
+
+async def get_rpc_session():
+    """Lazily create the shared aiohttp session for raw JSON-RPC calls"""
+    global rpc_session
+    if rpc_session is None or rpc_session.closed:
+        # Keep connections warm for the whole run: idle sockets survive a
+        # minute between bursts and DNS answers are cached so reconnects
+        # never stall on a resolver round-trip
+        connector = aiohttp.TCPConnector(limit=RPC_LIMIT, keepalive_timeout=60, ttl_dns_cache=300)
+        rpc_session = aiohttp.ClientSession(connector=connector, headers={"Content-Type": "application/json"})
+    return rpc_session
+
+async def _post_rpc(payload):
+    """POST a JSON-RPC request (single or batch) over the shared keep-alive session"""
+    session = await get_rpc_session()
+    # orjson on both sides: the payloads here are plain dicts/strings, and
+    # batch receipt responses are the largest JSON bodies the scanner decodes
+    async with session.post(
+        rpc_url,
+        data=orjson.dumps(payload),
+        timeout=aiohttp.ClientTimeout(total=30),
+    ) as response:
+        response.raise_for_status()
+        return orjson.loads(await response.read())
+
+async def _batch_rpc_call(method, params_list):
+    """
+    Call one JSON-RPC method for many parameter lists via chunked batch POSTs
+
+    The calls are split into RPC_BATCH_SIZE chunks (providers commonly cap
+    batch sizes) and the chunks are posted concurrently. Each POST costs one
+    rate-limit token - that is what the provider actually counts. Returns raw
+    results aligned with params_list (None for failed entries), or None if
+    the provider rejects batch requests altogether.
+    """
+    global batch_rpc_supported
+    if not params_list:
+        return []
 
-async def batch_rpc_requests(requests):
+    calls = [
+        {"jsonrpc": "2.0", "id": i, "method": method, "params": params}
+        for i, params in enumerate(params_list)
+    ]
+    chunks = [calls[i:i + RPC_BATCH_SIZE] for i in range(0, len(calls), RPC_BATCH_SIZE)]
+    by_id = {}
+    rejected = False
+
+    async def post_chunk(chunk):
+        nonlocal rejected
+        retries = 0
+        backoff = INITIAL_BACKOFF
+        while retries < MAX_RETRIES:
+            await track_request()
+            try:
+                responses = await _post_rpc(chunk)
+                if not isinstance(responses, list):
+                    rejected = True
+                    return
+                track_rpc_request()
+                # Map responses back to request order by id; surface per-entry errors
+                for resp in responses:
+                    if "error" in resp:
+                        logger.error("%s request %s failed: %s", method, resp.get("id"), resp["error"])
+                    else:
+                        by_id[resp.get("id")] = resp.get("result")
+                return
+            except aiohttp.ClientResponseError as e:
+                track_rpc_request(success=False)
+                # Decide from the status code, not the exception text
+                if e.status not in RETRYABLE_STATUS_CODES:
+                    logger.error("%s batch failed with HTTP %d: %s", method, e.status, e.message)
+                    return
+                retries += 1
+                if retries == MAX_RETRIES:
+                    logger.error("%s batch still failing (HTTP %d) after %d retries", method, e.status, MAX_RETRIES)
+                    return
+                delay = backoff
+                retry_after = e.headers.get("Retry-After") if e.headers else None
+                if retry_after and retry_after.isdigit():
+                    delay = max(delay, int(retry_after))
+                await asyncio.sleep(delay)
+                backoff *= 2
+            except Exception as e:
+                track_rpc_request(success=False)
+                retries += 1
+                if retries == MAX_RETRIES:
+                    logger.error("%s batch failed after %d retries: %s", method, MAX_RETRIES, e)
+                    return
+                await asyncio.sleep(backoff)
+                backoff *= 2
+
+    await asyncio.gather(*(post_chunk(chunk) for chunk in chunks))
+
+    if rejected:
+        # Provider rejected the batch - remember and fall back to per-call requests
+        logger.warning("Provider does not accept batch requests, falling back to per-call requests")
+        batch_rpc_supported = False
+        return None
+    return [by_id.get(i) for i in range(len(params_list))]
+
+async def fetch_receipts_batch(tx_hashes):
+    """
+    Fetch receipts for a list of tx hashes via chunked JSON-RPC batch POSTs
     """
-    Process multiple RPC requests in parallel batches
+    results = await _batch_rpc_call(
+        "eth_getTransactionReceipt", [[_to_hex_str(tx_hash)] for tx_hash in tx_hashes]
+    )
+    if results is None:
+        return None
+    return [_format_raw_receipt(result) for result in results]
+
+async def fetch_transactions_batch(tx_hashes):
+    """
+    Fetch transaction bodies for a list of tx hashes via JSON-RPC batches
     """
+    if not tx_hashes:
+        return []
+
+    if batch_rpc_supported:
+        results = await _batch_rpc_call(
+            "eth_getTransactionByHash", [[_to_hex_str(tx_hash)] for tx_hash in tx_hashes]
+        )
+        if results is not None:
+            return [_format_raw_transaction(result) for result in results]
+
+    # Fallback: individual lookups through the provider
     results = []
-    # Group requests into batches
-    batches = [requests[i:i + RPC_BATCH_SIZE] for i in range(0, len(requests), RPC_BATCH_SIZE)]
-    
-    # Process batches concurrently
-    for batch in batches:
-        batch_results = await asyncio.gather(*batch)
-        results.extend(batch_results)
+    for tx_hash in tx_hashes:
+        await track_request()
+        try:
+            results.append(await w3.eth.get_transaction(tx_hash))
+            track_rpc_request()
+        except Exception as e:
+            track_rpc_request(success=False)
+            logger.error("Failed to fetch transaction %s: %s", _to_hex_str(tx_hash), e)
+            results.append(None)
     return results
 
+async def get_block_receipts(block_number):
+    """
+    Fetch all receipts for a block with a single eth_getBlockReceipts call
+    """
+    global block_receipts_supported
+    if not block_receipts_supported:
+        return None
+
+    if block_number in receipts_cache:
+        receipts_cache.move_to_end(block_number)
+        return receipts_cache[block_number]
+
+    payload = {"jsonrpc": "2.0", "id": 1, "method": "eth_getBlockReceipts", "params": [hex(block_number)]}
+    await track_request()
+    try:
+        response = await _post_rpc(payload)
+        if not isinstance(response, dict):
+            track_rpc_request(success=False)
+            logger.error("Unexpected eth_getBlockReceipts response for block %d", block_number)
+            return None
+        error = response.get("error")
+        if error is not None:
+            track_rpc_request(success=False)
+            # Only "method not found" means the provider can never serve
+            # this; throttling/capacity errors are transient, so just skip
+            # the fast path for this one block
+            if isinstance(error, dict) and error.get("code") == -32601:
+                logger.warning("eth_getBlockReceipts not available, falling back to per-tx receipts")
+                block_receipts_supported = False
+            else:
+                logger.error("eth_getBlockReceipts error for block %d: %s", block_number, error)
+            return None
+        track_rpc_request()
+        receipts_by_hash = {r['transactionHash']: _format_raw_receipt(r) for r in response['result']}
+
+        # Update cache, evicting the least recently used entry
+        receipts_cache[block_number] = receipts_by_hash
+        if len(receipts_cache) > CACHE_SIZE:
+            receipts_cache.popitem(last=False)
+        return receipts_by_hash
+    except Exception as e:
+        track_rpc_request(success=False)
+        logger.error("eth_getBlockReceipts failed for block %d: %s", block_number, e)
+        return None
+
 async def get_transaction_receipts_batch(tx_hashes):
     """
     Get transaction receipts for multiple transactions using batch processing
     """
+    # Preferred path: one JSON-RPC batch POST instead of one round-trip per receipt
+    if batch_rpc_supported:
+        receipts = await fetch_receipts_batch(tx_hashes)
+        if receipts is not None:
+            return receipts
+
     async def get_receipt(tx_hash):
         retries = 0
         backoff = INITIAL_BACKOFF
         while retries < MAX_RETRIES:
             try:
                 await track_request()
-                # Run in thread pool to avoid blocking
-                loop = asyncio.get_event_loop()
-                receipt = await loop.run_in_executor(None, lambda: w3.eth.get_transaction_receipt(tx_hash))
+                receipt = await w3.eth.get_transaction_receipt(tx_hash)
                 return receipt
             except Exception as e:
                 retries += 1
                 if retries == MAX_RETRIES:
-                    logger.error(f"Failed to get receipt for {tx_hash} after {MAX_RETRIES} retries: {str(e)}")
+                    logger.error("Failed to get receipt for %s after %d retries: %s", tx_hash, MAX_RETRIES, e)
                     return None
                 else:
                     await asyncio.sleep(backoff)
                     backoff *= 2
     
-    # Create tasks for all receipts
-    receipt_tasks = [get_receipt(tx_hash) for tx_hash in tx_hashes]
-    return await batch_rpc_requests(receipt_tasks)
+    # Bound in-flight receipt lookups instead of serializing fixed sub-batches:
+    # with chunked gathers each group waited on its slowest member, while a
+    # semaphore keeps RPC_BATCH_SIZE requests in flight continuously
+    semaphore = asyncio.Semaphore(RPC_BATCH_SIZE)
+    async def get_receipt_bounded(tx_hash):
+        async with semaphore:
+            return await get_receipt(tx_hash)
+
+    return await asyncio.gather(*(get_receipt_bounded(tx_hash) for tx_hash in tx_hashes))
+
+async def _fetch_block(cache_key):
+    """Fetch one block from the provider and insert it into the LRU cache"""
+    block_number, full_transactions = cache_key
+    await track_request()
+    block = await w3.eth.get_block(block_number, full_transactions=full_transactions)
+
+    # Update cache, evicting the least recently used entry
+    block_cache[cache_key] = block
+    if len(block_cache) > CACHE_SIZE:
+        block_cache.popitem(last=False)
+    return block
+
+def _format_raw_block(raw):
+    """Convert a raw eth_getBlockByNumber result to the shape web3.py returns"""
+    if raw is None:
+        return None
+    transactions = raw.get('transactions', [])
+    if transactions and isinstance(transactions[0], dict):
+        transactions = [_format_raw_transaction(tx) for tx in transactions]
+    return AttributeDict({
+        'number': int(raw['number'], 16),
+        'timestamp': int(raw['timestamp'], 16),
+        'transactions': transactions,
+    })
 
-async def prefetch_block_data(block_number):
+async def get_blocks_batch(block_numbers, full_transactions=True):
+    """
+    Fetch several blocks via chunked JSON-RPC batches and populate the cache
+
+    Blocks the cache already holds (or that are in flight) are skipped; any
+    block the batch could not deliver falls back to the single-block path.
+    Returns blocks aligned with block_numbers, None where a fetch failed.
+    """
+    block_numbers = list(block_numbers)
+    if not block_numbers:
+        return []
+
+    misses = [
+        n for n in block_numbers
+        if (n, full_transactions) not in block_cache
+        and (n, full_transactions) not in inflight_blocks
+    ]
+    if misses and batch_rpc_supported:
+        results = await _batch_rpc_call(
+            "eth_getBlockByNumber", [[hex(n), full_transactions] for n in misses]
+        )
+        if results is not None:
+            for n, raw in zip(misses, results):
+                block = _format_raw_block(raw)
+                if block is None:
+                    continue
+                block_cache[(n, full_transactions)] = block
+                if len(block_cache) > CACHE_SIZE:
+                    block_cache.popitem(last=False)
+
+    # Whatever is still missing goes through the coalescing per-block path;
+    # a single bad block must not sink the rest of the window
+    blocks = await asyncio.gather(
+        *(prefetch_block_data(n, full_transactions=full_transactions) for n in block_numbers),
+        return_exceptions=True,
+    )
+    for n, block in zip(block_numbers, blocks):
+        if isinstance(block, Exception):
+            logger.error("Failed to prefetch block %d: %s", n, block)
+    return [None if isinstance(block, Exception) else block for block in blocks]
+
+async def prefetch_block_data(block_number, full_transactions=True):
     """
     Prefetch block data for upcoming blocks
     """
-    if block_number in block_cache:
-        return block_cache[block_number]
-    
-    await track_request()
-    # Run in thread pool to avoid blocking
-    loop = asyncio.get_event_loop()
-    block = await loop.run_in_executor(None, lambda: w3.eth.get_block(block_number, full_transactions=True))
-    
-    # Update cache
-    if len(block_cache) >= CACHE_SIZE:
-        # Remove oldest block from cache
-        oldest_block = min(block_cache.keys())
-        del block_cache[oldest_block]
-    
-    block_cache[block_number] = block
-    return block
+    # Hash-only and full blocks are cached separately so a light fetch can
+    # never shadow the full transaction list the fallback path needs
+    cache_key = (block_number, full_transactions)
+    if cache_key in block_cache:
+        block_cache.move_to_end(cache_key)
+        return block_cache[cache_key]
+
+    # Coalesce concurrent misses: the prefetch window and process_block can
+    # race for the same block, and only the first caller should pay the RPC
+    fetch = inflight_blocks.get(cache_key)
+    if fetch is None:
+        fetch = asyncio.create_task(_fetch_block(cache_key))
+        inflight_blocks[cache_key] = fetch
+        fetch.add_done_callback(lambda _: inflight_blocks.pop(cache_key, None))
+    return await fetch
 
-async def get_block_data(block_number):
+async def get_block_data(block_number, full_transactions=True):
     """
     Get block data with caching
     """
-    if block_number in block_cache:
-        return block_cache[block_number].transactions
-    
-    block = await prefetch_block_data(block_number)
+    block = await prefetch_block_data(block_number, full_transactions)
     return block.transactions
 
 def is_potential_contract_creation(tx):
@@ -242,109 +597,167 @@ def is_potential_contract_creation(tx):
         
     # Check input data for contract creation patterns
     input_data = tx['input']
-    if input_data and len(input_data) > 2:  # Ensure input exists and has content
-        # Convert input to string if it's bytes
-        if isinstance(input_data, bytes):
-            input_data = input_data.hex()
-        elif not input_data.startswith('0x'):
-            input_data = '0x' + input_data
-            
-        # Common contract creation bytecode patterns
-        creation_patterns = [
-            '0x60806040',  # Common constructor bytecode
-            '0x60606040',  # Another common pattern
-        ]
-        return any(input_data.startswith(pattern) for pattern in creation_patterns)
-    
-    return False
+    if not input_data:
+        return False
 
-def confirm_contract_creation(receipt):
-    """
-    Confirm if a transaction actually created a contract
-    """
-    return receipt.contractAddress is not None
+    if isinstance(input_data, (bytes, bytearray)):
+        # HexBytes from web3 - compare the first bytes directly, no hex
+        # round-trip over calldata that can run to tens of KB
+        return input_data.startswith(CREATION_PREFIXES_BYTES)
+
+    # Hex-string input (raw JSON-RPC path)
+    if not input_data.startswith('0x'):
+        input_data = '0x' + input_data
+    # startswith accepts a tuple, so all prefixes are checked in one C call
+    return input_data.startswith(CREATION_PREFIXES)
 
-async def process_transactions_batch(transactions, block_number, block_timestamp):
+# Pre-bound accessor for the receipt fields read per confirmed creation -
+# one AttributeDict probe instead of four in the hot loop
+_receipt_fields = operator.attrgetter('contractAddress', 'gasUsed', 'status', 'logs')
+
+async def process_transactions_batch(potential_creations, block_number, block_timestamp, receipts_by_hash=None):
     """
-    Process a batch of transactions, but only for potential contract creations
+    Process a batch of pre-filtered potential contract creations
     """
     batch_start_time = time.time()
-    
-    # Filter for potential contract creations
-    potential_creations = [
-        tx for tx in transactions 
-        if is_potential_contract_creation(tx)
-    ]
-    
+
     if not potential_creations:
         return [], 0
-    
+
     # Get receipts only for potential creations
-    tx_hashes = [tx.hash for tx in potential_creations]
-    receipts = await get_transaction_receipts_batch(tx_hashes)
+    if receipts_by_hash is not None:
+        # Receipts for the whole block were already fetched - pure local lookup
+        receipts = [receipts_by_hash.get(_to_hex_str(tx.hash)) for tx in potential_creations]
+    else:
+        tx_hashes = [tx.hash for tx in potential_creations]
+        receipts = await get_transaction_receipts_batch(tx_hashes)
     
+    # All transactions in a block share its timestamp - format it once
+    creation_time = datetime.fromtimestamp(block_timestamp).isoformat()
+
     # Process only confirmed contract creations
     contract_data_list = []
     for tx, receipt in zip(potential_creations, receipts):
-        if receipt and confirm_contract_creation(receipt):
-            # Convert HexBytes to strings
-            tx_hash = tx.hash.hex() if isinstance(tx.hash, (bytes, bytearray)) else str(tx.hash)
-            # Convert Unix timestamp to ISO format
-            creation_time = datetime.fromtimestamp(block_timestamp).isoformat()
-            
-            contract_data = {
-                "tx_hash": f"0x{tx_hash}",
-                "block_number": block_number,
-                "creator_address": tx["from"],
-                "contract_address": receipt.contractAddress,
-                "creation_timestamp": creation_time,
-                "init_code_hash": tx["input"].hex() if isinstance(tx["input"], (bytes, bytearray)) else str(tx["input"]),
-                "gas_used": receipt.gasUsed,
-                "status": receipt.status == 1,
-                "logs_count": len(receipt.logs),
-                "metadata": {}  # For future extensibility
-            }
-            contract_data_list.append(contract_data)
+        if receipt is None:
+            continue
+        contract_address, gas_used, status, logs = _receipt_fields(receipt)
+        if contract_address is None:
+            # Candidate did not actually create a contract
+            continue
+
+        # Hashes stay as HexBytes until this point - convert exactly once
+        tx_hash = _to_hex_str(tx.hash)
+
+        contract_data = {
+            "tx_hash": tx_hash,
+            "block_number": block_number,
+            "creator_address": tx["from"],
+            "contract_address": contract_address,
+            "creation_timestamp": creation_time,
+            # 32-byte digest, not the full init code - some init codes run
+            # tens of KB and were bloating every insert payload
+            "init_code_hash": _init_code_hash(tx["input"]),
+            "gas_used": gas_used,
+            "status": status == 1,
+            "logs_count": len(logs),
+            "metadata": {}  # For future extensibility
+        }
+        contract_data_list.append(contract_data)
     
     batch_time = time.time() - batch_start_time
     return contract_data_list, batch_time
 
+async def flush_pending_contracts():
+    """
+    Swap out the pending contract buffer and store it with one bulk insert
+    """
+    global pending_contracts
+    async with pending_lock:
+        if not pending_contracts:
+            return
+        batch = pending_contracts
+        pending_contracts = []
+
+    try:
+        # The supabase client is synchronous - keep its HTTP round-trip off the event loop
+        batch_result = await asyncio.to_thread(store_transactions_batch, batch)
+        if batch_result:
+            logger.info("Stored %d contract creations in one bulk insert", len(batch))
+        else:
+            logger.error("Failed to store batch of %d contract creations", len(batch))
+    except Exception as e:
+        # Duplicates are recognized by error code inside store_transactions_batch;
+        # anything that escapes to here is a real failure
+        logger.error("Error storing contract creations: %s", e)
+
+async def periodic_flush():
+    """Flush pending contract creations on a fixed interval"""
+    while not shutdown_event.is_set():
+        await asyncio.sleep(FLUSH_INTERVAL)
+        await flush_pending_contracts()
+
 async def process_block(block_number):
     """
     Process a single block for contract creations
     """
-    logger.info(f"Processing block {block_number}")
+    logger.info("Processing block %d", block_number)
     block_start_time = time.time()
     
-    # Get block data with prefetching
-    block = await prefetch_block_data(block_number)
+    # Canonical fetch: receipts identify contract creations on their own
+    # (contractAddress set), so when eth_getBlockReceipts works we only need
+    # the hash-only block header plus the few creation tx bodies - never the
+    # full calldata payload of every transaction. Receipts and header are
+    # independent requests, so they go out concurrently.
+    if block_receipts_supported:
+        receipts_by_hash, block = await asyncio.gather(
+            get_block_receipts(block_number),
+            prefetch_block_data(block_number, full_transactions=False),
+        )
+    else:
+        receipts_by_hash = None
+
+    if receipts_by_hash is not None:
+        creation_hashes = [
+            r.transactionHash for r in receipts_by_hash.values()
+            if r.contractAddress is not None
+        ]
+        potential_creations = [
+            tx for tx in await fetch_transactions_batch(creation_hashes)
+            if tx is not None
+        ]
+    else:
+        # Fallback: full block plus local bytecode-prefix filtering
+        block = await prefetch_block_data(block_number)
+        potential_creations = [tx for tx in block.transactions if is_potential_contract_creation(tx)]
+
     transactions = block.transactions
     block_timestamp = block.timestamp
-    
-    # Quick pre-check for potential contract creations
-    potential_creations = [tx for tx in transactions if is_potential_contract_creation(tx)]
+
+    # Transaction counts come straight from the fetched block - no extra RPC
+    stats.total_txs += len(transactions)
+
     if not potential_creations:
-        logger.info(f"Block {block_number} has no potential contract creations, skipping batch processing")
+        logger.info("Block %d has no potential contract creations, skipping batch processing", block_number)
         block_time = time.time() - block_start_time
-        logger.info(f"Block {block_number} processed in {block_time:.2f} seconds")
+        logger.info("Block %d processed in %.2f seconds", block_number, block_time)
         return 0
-    
-    logger.info(f"Block {block_number} has {len(potential_creations)} potential contract creations")
-    
+
+    logger.info("Block %d has %d potential contract creations", block_number, len(potential_creations))
+
     # Process transactions in parallel batches
     stored_contracts = 0
     total_batch_time = 0
-    
-    # Create batches
+
+    # Batch only the filtered candidates - the predicate already ran once above
     batches = []
-    for i in range(0, len(transactions), BATCH_SIZE):
-        batches.append(transactions[i:i + BATCH_SIZE])
-    
+    for i in range(0, len(potential_creations), BATCH_SIZE):
+        batches.append(potential_creations[i:i + BATCH_SIZE])
+
     # Process batches in parallel with a limit
     semaphore = asyncio.Semaphore(MAX_CONCURRENT_BATCHES)
     async def process_batch_with_semaphore(batch):
         async with semaphore:
-            return await process_transactions_batch(batch, block_number, block_timestamp)
+            return await process_transactions_batch(batch, block_number, block_timestamp, receipts_by_hash)
     
     # Process all batches concurrently
     tasks = [process_batch_with_semaphore(batch) for batch in batches]
@@ -356,79 +769,86 @@ async def process_block(block_number):
         all_contract_data.extend(contract_data_list)
         total_batch_time += batch_time
     
-    # Store all contract creations in a single bulk operation
+    # Buffer confirmed creations; bulk flushes amortize the DB round-trip
     if all_contract_data:
-        try:
-            batch_result = store_transactions_batch(all_contract_data)
-            if batch_result:
-                stored_contracts = len(all_contract_data)
-                logger.info(f"Successfully stored {stored_contracts} new contract creations from block {block_number}")
-            else:
-                # Check if it's a duplicate key error
-                if "duplicate key value" in str(batch_result):
-                    logger.info(f"Block {block_number} contract creations already exist in database - skipping")
-                else:
-                    logger.error(f"Failed to store contract creations for block {block_number}: {str(batch_result)}")
-        except Exception as e:
-            if "23505" in str(e):  # PostgreSQL duplicate key error
-                logger.info(f"Block {block_number} contract creations already exist in database - skipping")
-            else:
-                logger.error(f"Error storing contract creations for block {block_number}: {str(e)}")
+        async with pending_lock:
+            pending_contracts.extend(all_contract_data)
+            pending_count = len(pending_contracts)
+        stored_contracts = len(all_contract_data)
+        logger.info("Buffered %d contract creations from block %d (%d pending)", stored_contracts, block_number, pending_count)
+        if pending_count >= FLUSH_SIZE:
+            await flush_pending_contracts()
     
     block_time = time.time() - block_start_time
     avg_batch_time = total_batch_time / len(batches) if batches else 0
     
-    logger.info(f"Block {block_number} processed in {block_time:.2f} seconds")
-    logger.info(f"Average batch processing time: {avg_batch_time:.2f} seconds")
-    logger.info(f"Contract creations found: {stored_contracts}")
-    logger.info(f"Current RPC request rate: {len(request_times)} requests in last second")
+    logger.info("Block %d processed in %.2f seconds", block_number, block_time)
+    logger.info("Average batch processing time: %.2f seconds", avg_batch_time)
+    logger.info("Contract creations found: %d", stored_contracts)
+    logger.info("Rate limiter tokens available: %.1f/%d", rate_limiter.tokens, RPC_LIMIT)
     
     return stored_contracts
 
+# Report file handle (opened lazily once, then streamed to)
+report_file = None
+
 def write_report(content):
     """Write content to the report file"""
-    with open(report_filename, 'a', encoding='utf-8') as f:
-        f.write(content + '\n')
+    global report_file
+    if report_file is None:
+        # Large userspace buffer so report updates coalesce into few write() syscalls
+        report_file = open(report_filename, 'a', encoding='utf-8', buffering=1 << 20)
+    report_file.write(content + '\n')
+
+def _close_report_file():
+    """Flush and close the report file on exit"""
+    if report_file is not None and not report_file.closed:
+        report_file.close()
+
+atexit.register(_close_report_file)
 
 async def cleanup_and_shutdown():
     """Clean up resources and generate final report."""
     logger.info("Initiating cleanup and shutdown...")
-    
+
+    # Make sure nothing buffered is lost
+    await flush_pending_contracts()
+
     try:
         # Calculate final metrics
         end_time = time.time()
-        duration = end_time - experiment_start_time if experiment_start_time else 0
-        blocks_processed = experiment_end_block - experiment_start_block if experiment_end_block and experiment_start_block else 0
+        duration = end_time - stats.start_time if stats.start_time else 0
+        blocks_processed = stats.end_block - stats.start_block if stats.end_block and stats.start_block else 0
         blocks_per_second = blocks_processed / duration if duration > 0 else 0
-        contracts_per_second = experiment_contract_count / duration if duration > 0 else 0
+        contracts_per_second = stats.contract_count / duration if duration > 0 else 0
         
         # Calculate block gap
-        current_chain_block = w3.eth.block_number
-        block_gap = current_chain_block - experiment_end_block if experiment_end_block else 0
+        current_chain_block = await w3.eth.block_number
+        block_gap = current_chain_block - stats.end_block if stats.end_block else 0
         gap_percentage = (block_gap / current_chain_block * 100) if current_chain_block > 0 else 0
         
         # Calculate RPC success rate
-        rpc_success_rate = ((experiment_rpc_requests - experiment_rpc_errors) / experiment_rpc_requests * 100) if experiment_rpc_requests > 0 else 0
+        rpc_success_rate = ((stats.rpc_requests - stats.rpc_errors) / stats.rpc_requests * 100) if stats.rpc_requests > 0 else 0
         
         # Calculate average transactions per block
-        avg_txs_per_block = experiment_total_txs / blocks_processed if blocks_processed > 0 else 0
+        avg_txs_per_block = stats.total_txs / blocks_processed if blocks_processed > 0 else 0
         
         # Generate final report
         report_content = f"""
 === Final Experiment Results ===
 Duration: {duration:.2f} seconds
-Start Block: {experiment_start_block}
-Last Processed Block: {experiment_end_block}
+Start Block: {stats.start_block}
+Last Processed Block: {stats.end_block}
 Current Chain Block: {current_chain_block}
 Block Gap: {block_gap} ({gap_percentage:.2f}%)
 Blocks Processed: {blocks_processed}
 Blocks per Second: {blocks_per_second:.2f}
-Contract Creations Found: {experiment_contract_count}
+Contract Creations Found: {stats.contract_count}
 Contracts per Second: {contracts_per_second:.2f}
-Total Transactions Processed: {experiment_total_txs}
+Total Transactions Processed: {stats.total_txs}
 Average Transactions per Block: {avg_txs_per_block:.2f}
-RPC Requests Made: {experiment_rpc_requests}
-RPC Errors: {experiment_rpc_errors}
+RPC Requests Made: {stats.rpc_requests}
+RPC Errors: {stats.rpc_errors}
 RPC Success Rate: {rpc_success_rate:.2f}%
 =====================
 """
@@ -446,9 +866,37 @@ RPC Success Rate: {rpc_success_rate:.2f}%
         write_report(error_content)
     
     finally:
+        # Close the shared RPC session
+        if rpc_session is not None and not rpc_session.closed:
+            await rpc_session.close()
         logger.info("Cleanup complete. Exiting...")
         exit(0)
 
+async def watch_new_blocks():
+    """
+    Yield new chain-head block numbers as they arrive
+
+    With BASE_MAINNET_WSS_URL set, a newHeads WebSocket subscription pushes
+    heads at network latency with zero polling RPCs. Otherwise fall back to
+    polling eth_blockNumber once per second.
+    """
+    if wss_url:
+        try:
+            async with AsyncWeb3.persistent_websocket(WebsocketProviderV2(wss_url)) as w3_ws:
+                await w3_ws.eth.subscribe("newHeads")
+                logger.info("Subscribed to newHeads via WebSocket")
+                async for message in w3_ws.ws.process_subscriptions():
+                    yield message["result"]["number"]
+                    if shutdown_event.is_set():
+                        return
+        except Exception as e:
+            logger.error("newHeads subscription failed, falling back to polling: %s", e)
+
+    while not shutdown_event.is_set():
+        await track_request()
+        yield await w3.eth.block_number
+        await asyncio.sleep(1)
+
 async def timer():
     """Timer function that sets the shutdown event"""
     await asyncio.sleep(300)  # 5 minutes
@@ -465,18 +913,17 @@ async def main():
     logger.info("Signal handlers set up. Script will run for 5 minutes.")
     
     # Test database connection
-    if not test_connection():
+    if not await asyncio.to_thread(test_connection):
         logger.error("Failed to connect to Supabase. Exiting...")
         return
     
     # Initialize experiment tracking
-    global experiment_start_time, experiment_start_block
-    experiment_start_time = time.time()
+    stats.start_time = time.time()
     
     # Get latest block number
     await track_request()
-    latest_block = w3.eth.block_number
-    experiment_start_block = latest_block
+    latest_block = await w3.eth.block_number
+    stats.start_block = latest_block
     logger.info(f"Latest block number: {latest_block}")
     logger.info(f"Starting continuous processing at {datetime.now().isoformat()}")
     
@@ -485,39 +932,59 @@ async def main():
     start_time = time.time()
     current_block = latest_block
     
-    # Start timer task
+    # Start timer and periodic flush tasks
     timer_task = asyncio.create_task(timer())
-    
+    flush_task = asyncio.create_task(periodic_flush())
+
     try:
-        while not shutdown_event.is_set():
-            # Get new latest block
-            await track_request()
-            new_latest_block = w3.eth.block_number
-            
+        async for new_latest_block in watch_new_blocks():
+            if shutdown_event.is_set():
+                break
+
             if new_latest_block > current_block:
                 logger.info(f"Processing new blocks from {current_block} to {new_latest_block}")
                 
-                # Process each block
-                for block_number in range(current_block, new_latest_block + 1):
+                # Process the backlog in slices of BLOCK_CONCURRENCY blocks:
+                # each slice is fetched with one batched call and its blocks
+                # are processed concurrently, while the next slice's fetch
+                # overlaps with this slice's processing. The slice width is
+                # the concurrency cap - wider fan-out would only queue up
+                # behind the rate limiter and the HTTP connector.
+                next_prefetch = None
+                for start in range(current_block, new_latest_block + 1, BLOCK_CONCURRENCY):
                     if shutdown_event.is_set():
                         break
-                    contracts_found = await process_block(block_number)
-                    total_contracts += contracts_found
-                    
-                    # Update experiment tracking
-                    global experiment_end_block, experiment_contract_count
-                    experiment_end_block = block_number
-                    experiment_contract_count = total_contracts
-                
+                    chunk = range(start, min(start + BLOCK_CONCURRENCY, new_latest_block + 1))
+                    warm_task = next_prefetch or asyncio.create_task(
+                        get_blocks_batch(chunk, full_transactions=not block_receipts_supported)
+                    )
+                    next_start = start + BLOCK_CONCURRENCY
+                    if next_start <= new_latest_block:
+                        next_chunk = range(next_start, min(next_start + BLOCK_CONCURRENCY, new_latest_block + 1))
+                        next_prefetch = asyncio.create_task(
+                            get_blocks_batch(next_chunk, full_transactions=not block_receipts_supported)
+                        )
+                    else:
+                        next_prefetch = None
+                    await warm_task
+                    async with asyncio.TaskGroup() as tg:
+                        block_tasks = [tg.create_task(process_block(n)) for n in chunk]
+                    total_contracts += sum(task.result() for task in block_tasks)
+
+                    # Update experiment tracking (end_block starts as None)
+                    stats.end_block = chunk[-1] if stats.end_block is None else max(stats.end_block, chunk[-1])
+                    stats.contract_count = total_contracts
+
+                # Don't leave a prefetch in flight if we broke out early
+                if next_prefetch is not None and not next_prefetch.done():
+                    next_prefetch.cancel()
+
                 current_block = new_latest_block + 1
-            else:
-                # If we're caught up, wait a bit before checking for new blocks
-                await asyncio.sleep(1)
-            
+
             # Log progress every minute
             elapsed_time = time.time() - start_time
             if elapsed_time >= 60:
-                blocks_processed = current_block - experiment_start_block
+                blocks_processed = current_block - stats.start_block
                 progress_content = f"""
 === Progress Update ===
 Time Elapsed: {elapsed_time:.2f} seconds
@@ -544,9 +1011,18 @@ Processing Speed: {blocks_processed/elapsed_time:.2f} blocks/second
         # If shutdown event is set, perform cleanup
         if shutdown_event.is_set():
             await cleanup_and_shutdown()
-        # Cancel timer task if it's still running
+        # Cancel background tasks if they're still running
         if not timer_task.done():
             timer_task.cancel()
+        if not flush_task.done():
+            flush_task.cancel()
 
 if __name__ == "__main__":
-    asyncio.run(main()) 
\ No newline at end of file
+    try:
+        # libuv event loop: cheaper task scheduling for the gather-heavy
+        # fan-out below. Optional - stdlib asyncio works fine without it.
+        import uvloop
+        uvloop.install()
+    except ImportError:
+        pass
+    asyncio.run(main())
\ No newline at end of file
@@ -1,6 +1,7 @@
 import os
 import logging
 from supabase import create_client, Client
+from postgrest.exceptions import APIError
 from dotenv import load_dotenv
 
 # Load environment variables
@@ -36,9 +37,18 @@ def store_transactions_batch(contract_data):
     """
     Store a batch of contract creations in Supabase
     """
+    if not contract_data:
+        return True
     try:
-        response = supabase.table("contract_creations").insert(contract_data).execute()
+        # ON CONFLICT DO NOTHING: rows that were already indexed come back as
+        # a normal zero-row result instead of a 23505 exception to unwind
+        supabase.table("contract_creations").upsert(
+            contract_data, on_conflict="tx_hash", ignore_duplicates=True
+        ).execute()
         return True
+    except APIError as e:
+        logger.error(f"Error storing contract creations: {e.message}")
+        return False
     except Exception as e:
         logger.error(f"Error storing contract creations: {str(e)}")
         return False 
\ No newline at end of file